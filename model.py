@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.ext.mutable import MutableDict, MutableList
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -6,21 +7,36 @@ db = SQLAlchemy()
 class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     model_name = db.Column(db.String(100), nullable=False)
-    
-    # Workflow Stage: 
+
+    # Denormalized copy of pis_data['header_info']['brand'] so list views can
+    # read it as a plain column instead of cracking the JSON blob. Kept in
+    # sync by every handler that edits the header.
+    brand = db.Column(db.String(128), index=True)
+
+    # Workflow Stage:
     # 'marketing_draft', 'pending_director_pis', 'marketing_changes_requested',
     # 'ready_for_web', 'specsheet_draft', 'pending_director_spec', 'web_changes_requested', 'finalized'
-    workflow_stage = db.Column(db.String(50), default='marketing_draft')
-    
+    workflow_stage = db.Column(db.String(50), default='marketing_draft', index=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Data Fields
-    pis_data = db.Column(db.JSON)       # Stores the PIS structure
-    spec_data = db.Column(db.JSON)      # Stores specific SpecSheet styling/SEO data
-    
+
+    # Composite index for the dashboard queries: filter by stage(s), newest
+    # first. Turns full scan + sort into an index seek. Picked up by
+    # db.create_all() on fresh databases; _migrate_product_schema() in app.py
+    # creates it on existing ones.
+    __table_args__ = (
+        db.Index('ix_product_stage_created', 'workflow_stage', 'created_at'),
+    )
+    
+    # Data Fields — wrapped in MutableDict so top-level key writes mark the
+    # column dirty automatically. Nested sub-dicts are still plain dicts, so
+    # handlers that edit those in place keep their explicit flag_modified.
+    pis_data = db.Column(MutableDict.as_mutable(db.JSON))       # Stores the PIS structure
+    spec_data = db.Column(MutableDict.as_mutable(db.JSON))      # Stores specific SpecSheet styling/SEO data
+
     # --- NEW: Stores pending AI revisions & Director section comments ---
     # Structure: { 'range_overview': {'comment': '...', 'ai_suggestion': '...', 'original': '...'}, ... }
-    revision_data = db.Column(db.JSON)
+    revision_data = db.Column(MutableDict.as_mutable(db.JSON))
     
     image_path = db.Column(db.String(200))
     seo_keywords = db.Column(db.String(255))
@@ -28,7 +44,7 @@ class Product(db.Model):
     # Approval & Feedback
     director_pis_comments = db.Column(db.Text)      # General Global Comments
     director_spec_comments = db.Column(db.Text)     # Comments on final SpecSheet/SEO
-    additional_images = db.Column(db.JSON, default=list)
+    additional_images = db.Column(MutableList.as_mutable(db.JSON), default=list)
 
 class ProductHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
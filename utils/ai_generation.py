@@ -6,11 +6,49 @@ Handles all Gemini AI-powered content generation
 import json
 import time
 import re
+import hashlib
 import google.generativeai as genai
 from .category_classifier import classify_product_category
 from .json_utils import safe_json_loads
 
 
+MODEL_NAME = 'models/gemini-flash-latest'
+
+# One shared model handle — constructing GenerativeModel per call just
+# re-parses the model name and rebuilds the client config every time
+_gemini_model = genai.GenerativeModel(MODEL_NAME)
+
+
+# ===== AI REVISION CACHE =====
+# Each revision is a paid multi-second Gemini round-trip; directors often
+# re-request the same section with the same comment, so memoize exact repeats.
+# Bounded FIFO — every unique (section, original, comment) adds an entry, so
+# an uncapped dict would grow for the life of the worker.
+_revision_cache = {}  # {sha256(section|original|comment): suggestion}
+_REVISION_CACHE_MAX = 256
+
+
+def _revision_cache_key(section_name, original_content, director_comment):
+    raw = json.dumps(
+        [section_name, original_content, director_comment],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def clear_revision_cache():
+    """Drop all memoized AI revisions (mainly for tests/memory pressure)."""
+    _revision_cache.clear()
+
+
+def _remember_revision(cache_key, suggestion):
+    """Store a usable revision in the cache and pass it through."""
+    if cache_key not in _revision_cache and len(_revision_cache) >= _REVISION_CACHE_MAX:
+        _revision_cache.pop(next(iter(_revision_cache)))
+    _revision_cache[cache_key] = suggestion
+    return suggestion
+
+
 def generate_pis_data(file_paths, model_name, url_data):
     """Generate single PIS data from uploaded file(s) and/or website data.
     
@@ -43,7 +81,7 @@ def generate_pis_data(file_paths, model_name, url_data):
         candidates = url_data.get('image_candidates', [])
         image_candidates_str = "IMAGE CANDIDATES (Ranked by crawler):\n" + "\n".join([f"- {url}" for url in candidates])
 
-    model = genai.GenerativeModel('models/gemini-flash-latest')
+    model = _gemini_model
 
     # Build source description based on what's available
     if uploaded_files and web_context:
@@ -109,7 +147,7 @@ def generate_pis_data(file_paths, model_name, url_data):
 
 def generate_comprehensive_spec_data(pis_data):
     """Generate comprehensive spec sheet data from PIS data."""
-    model = genai.GenerativeModel('models/gemini-flash-latest')
+    model = _gemini_model
     
     # Extract sales arguments for strict prompt
     sales_arguments = pis_data.get('sales_arguments', [])
@@ -275,7 +313,7 @@ def generate_bulk_pis_data(file_paths, url_data, product_filter=""):
     Match by product name, model number, or any close variation. If a listed product is not found, skip it.
     """
 
-    model = genai.GenerativeModel('models/gemini-flash-latest')
+    model = _gemini_model
     
     prompt = f"""
     You are an expert Product Data Specialist and Technical Researcher. 
@@ -326,7 +364,7 @@ def generate_bulk_pis_data(file_paths, url_data, product_filter=""):
 
 def generate_specsheet_optimization(product_data):
     """Generate spec sheet optimization suggestions."""
-    model = genai.GenerativeModel('models/gemini-flash-latest')
+    model = _gemini_model
     prompt = f"""
     Review this PIS data: {json.dumps(product_data)}.
     1. Refine 'seo_long_description' for a PDF SpecSheet.
@@ -341,7 +379,7 @@ def generate_specsheet_optimization(product_data):
         return {}
 
 
-def generate_ai_revision(section_name, original_content, director_comment):
+def generate_ai_revision(section_name, original_content, director_comment, nocache=False):
     """
     Uses Gemini to rewrite content based on Director's feedback.
     Ensures correct data types:
@@ -349,9 +387,19 @@ def generate_ai_revision(section_name, original_content, director_comment):
     - technical_specifications -> Dict[str, str]
     - header_info -> Dict with fixed keys
     - others -> str
+
+    Pass nocache=True to force a fresh suggestion (the retry flow) — the
+    new result still replaces the cached one.
     """
 
-    model = genai.GenerativeModel('models/gemini-flash-latest')
+    # Exact-match cache: same section + original + comment → same suggestion,
+    # answered in microseconds instead of a fresh LLM round-trip.
+    cache_key = _revision_cache_key(section_name, original_content, director_comment)
+    if not nocache and cache_key in _revision_cache:
+        print(f"AI Revision cache hit [{section_name}]")
+        return _revision_cache[cache_key]
+
+    model = _gemini_model
 
     # ---------- FORMAT ENFORCEMENT ----------
     if section_name == "sales_arguments":
@@ -415,31 +463,31 @@ def generate_ai_revision(section_name, original_content, director_comment):
             # ---------- HARD TYPE ENFORCEMENT ----------
             if section_name == "sales_arguments":
                 if isinstance(parsed, list):
-                    return [str(x).strip() for x in parsed if str(x).strip()]
-                return [str(parsed)]
+                    return _remember_revision(cache_key, [str(x).strip() for x in parsed if str(x).strip()])
+                return _remember_revision(cache_key, [str(parsed)])
 
             if isinstance(original_content, dict) and isinstance(parsed, dict):
-                return parsed
+                return _remember_revision(cache_key, parsed)
 
             if isinstance(original_content, list) and isinstance(parsed, list):
-                return parsed
+                return _remember_revision(cache_key, parsed)
 
-            return parsed
+            return _remember_revision(cache_key, parsed)
 
         except Exception:
             # ---------- FAILSAFE FALLBACKS ----------
             if section_name == "sales_arguments":
                 # Split common AI separators safely
-                return [
+                return _remember_revision(cache_key, [
                     x.strip()
                     for x in re.split(r'[;\n•\-]', result)
                     if x.strip()
-                ]
+                ])
 
             if isinstance(original_content, list):
-                return [x.strip() for x in result.split("\n") if x.strip()]
+                return _remember_revision(cache_key, [x.strip() for x in result.split("\n") if x.strip()])
 
-            return result
+            return _remember_revision(cache_key, result)
 
     except Exception as e:
         print(f"AI Revision Error [{section_name}]: {e}")
@@ -7,10 +7,13 @@ from datetime import datetime
 from model import db, ProductHistory
 
 
-def log_event(product_id, actor, title, description, action_type='neutral'):
+def log_event(product_id, actor, title, description, action_type='neutral', commit=True):
     """
     Logs an event to the ProductHistory table.
     action_type options: 'neutral' (gray), 'waiting' (blue), 'action' (red), 'success' (green)
+
+    Pass commit=False inside batch loops so the event rides along with the
+    caller's next commit instead of forcing an extra fsync per item.
     """
     try:
         event = ProductHistory(
@@ -22,6 +25,7 @@ def log_event(product_id, actor, title, description, action_type='neutral'):
             timestamp=datetime.now()
         )
         db.session.add(event)
-        db.session.commit()
+        if commit:
+            db.session.commit()
     except Exception as e:
         print(f"Failed to log history: {e}")
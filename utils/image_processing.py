@@ -14,7 +14,7 @@ from urllib.parse import urlparse, urljoin
 from werkzeug.utils import secure_filename
 import google.generativeai as genai
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from PIL import Image
+from PIL import Image, ImageStat
 
 
 def extract_domain(url):
@@ -106,6 +106,23 @@ def is_bad_image_url(url: str) -> bool:
         return False
 
 
+def _is_plausible_product_image(image_bytes: bytes) -> bool:
+    """
+    Cheap local pre-filter run before paying for AI ranking:
+    rejects undersized images and near-solid fills (blank placeholders,
+    separators). Same thresholds as the PDF extraction pass.
+    """
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        if img.width < 150 or img.height < 150:
+            return False
+        small = img.resize((50, 50)).convert('RGB')
+        stddev = ImageStat.Stat(small).stddev
+        return sum(stddev) / len(stddev) >= 15
+    except Exception:
+        return False
+
+
 def ai_validate_image(image_bytes: bytes, product_name: str) -> bool:
     """
     Lightweight AI check:
@@ -473,8 +490,14 @@ def find_and_validate_image(model_name: str, supplier_url: str | None = None) ->
             except Exception as e:
                 print(f"Parallel download error for candidate {idx+1}: {e}")
 
-    # Zip URLs with their successfully downloaded bytes
-    valid_pairs = [(candidates_to_eval[i], downloaded_data[i]) for i in range(len(candidates_to_eval)) if downloaded_data[i]]
+    # Zip URLs with their successfully downloaded bytes, dropping anything
+    # the local plausibility check rejects — no point paying the AI ranker
+    # for blank placeholders or icons
+    valid_pairs = [
+        (candidates_to_eval[i], downloaded_data[i])
+        for i in range(len(candidates_to_eval))
+        if downloaded_data[i] and _is_plausible_product_image(downloaded_data[i])
+    ]
     
     if not valid_pairs:
         print("🚫 No images could be downloaded for evaluation")
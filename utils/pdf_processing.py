@@ -8,6 +8,7 @@ import os
 import io
 import json
 import time
+import threading
 import fitz  # PyMuPDF
 from PIL import Image, ImageFilter, ImageStat
 from werkzeug.utils import secure_filename
@@ -16,15 +17,69 @@ import google.generativeai as genai
 
 # ===== EMBEDDED IMAGE CACHE =====
 # Avoids re-scanning the same PDF for every product in bulk uploads
-_embedded_cache = {}  # {pdf_path: [candidate_images]}
+_embedded_cache = {}  # {(pdf_path, mtime_ns): [candidate_images]}
+
+# ===== PAGE RENDER CACHE =====
+# Screenshot-scan fallback renders pages at 3x — by far the most expensive
+# part of a bulk import when it triggers per item. Render each PDF's pages
+# once and share the PNGs across items (and worker threads).
+_page_render_cache = {}  # {(pdf_path, mtime_ns): [png bytes per page]}
+_page_text_cache = {}    # {(pdf_path, mtime_ns): [lowercased text per page]}
+_render_lock = threading.Lock()
+
+
+def _cache_key(pdf_path):
+    """Uploads reuse the same secure_filename path, so key by mtime as well —
+    a re-uploaded file must not hit the previous file's cached renders."""
+    return (pdf_path, os.stat(pdf_path).st_mtime_ns)
 
 def clear_pdf_cache():
     """Call after a bulk upload finishes to free memory."""
-    global _embedded_cache
     _embedded_cache.clear()
+    _page_render_cache.clear()
+    _page_text_cache.clear()
     print("🧹 PDF image cache cleared")
 
 
+def _get_page_renders(pdf_path, max_pages=8):
+    """Open the PDF once and return cached 3x-resolution page renders."""
+    key = _cache_key(pdf_path)
+    with _render_lock:
+        if key in _page_render_cache:
+            return _page_render_cache[key]
+
+        doc = fitz.open(pdf_path)
+        renders = []
+        for page_num in range(min(max_pages, len(doc))):
+            pix = doc[page_num].get_pixmap(matrix=fitz.Matrix(3, 3))
+            renders.append(pix.tobytes("png"))
+        doc.close()
+
+        _page_render_cache[key] = renders
+        print(f"  📦 Cached {len(renders)} page renders for reuse")
+        return renders
+
+
+def _get_page_texts(pdf_path, max_pages=8):
+    """Cached lowercased text per page — text extraction is orders of
+    magnitude cheaper than rasterizing, so it's worth doing up front to
+    decide which pages deserve an AI scan at all."""
+    key = _cache_key(pdf_path)
+    with _render_lock:
+        if key in _page_text_cache:
+            return _page_text_cache[key]
+
+        doc = fitz.open(pdf_path)
+        texts = [
+            doc[page_num].get_text("text").lower()
+            for page_num in range(min(max_pages, len(doc)))
+        ]
+        doc.close()
+
+        _page_text_cache[key] = texts
+        return texts
+
+
 def extract_specific_image(pdf_path, target_model, upload_folder):
     """
     Extracts a product image from a PDF using a multi-pass approach:
@@ -66,8 +121,9 @@ def _extract_embedded_images(pdf_path, target_model, upload_folder):
     
     try:
         # Check cache first — avoid re-scanning for every product
-        if pdf_path in _embedded_cache:
-            candidate_images = _embedded_cache[pdf_path]
+        cache_key = _cache_key(pdf_path)
+        if cache_key in _embedded_cache:
+            candidate_images = _embedded_cache[cache_key]
             print(f"  📦 Using cached {len(candidate_images)} embedded images (skipping PDF scan)")
         else:
             # First time — scan the PDF and cache results
@@ -119,7 +175,7 @@ def _extract_embedded_images(pdf_path, target_model, upload_folder):
             doc.close()
             
             # Cache for subsequent products
-            _embedded_cache[pdf_path] = candidate_images
+            _embedded_cache[cache_key] = candidate_images
             print(f"  📦 Cached {len(candidate_images)} embedded images for reuse")
         
         if not candidate_images:
@@ -147,24 +203,30 @@ def _extract_via_screenshot(pdf_path, target_model, upload_folder):
     - Quality validation on cropped result
     """
     try:
-        doc = fitz.open(pdf_path)
+        # Page renders are cached per PDF, so bulk imports pay the open +
+        # rasterize cost once instead of once per item
+        page_renders = _get_page_renders(pdf_path)
         model = genai.GenerativeModel('models/gemini-flash-latest')
-        
-        print(f"  📸 Screenshot scan: {min(8, len(doc))} pages at 3x resolution")
-        
+
+        # Only scan pages whose text actually mentions the target model —
+        # each page costs a Gemini round-trip plus rate-limit sleep, and in
+        # bulk invoices most pages belong to other products. If no page
+        # matches (scanned PDFs with no text layer), fall back to all pages.
+        page_texts = _get_page_texts(pdf_path)
+        target = target_model.lower()
+        scan_pages = [i for i, text in enumerate(page_texts) if target in text]
+        if not scan_pages:
+            scan_pages = list(range(len(page_renders)))
+
+        print(f"  📸 Screenshot scan: {len(scan_pages)}/{len(page_renders)} pages at 3x resolution")
+
         # Scan up to 8 pages (increased from 5)
-        for page_num in range(min(8, len(doc))):
-            if page_num > 0:
+        for scan_idx, page_num in enumerate(scan_pages):
+            page_img_bytes = page_renders[page_num]
+            if scan_idx > 0:
                 time.sleep(0.5)  # Rate limiting
-            
+
             try:
-                page = doc[page_num]
-                
-                # 3x resolution matrix for sharper rendering (was 2x)
-                pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
-                page_img_bytes = pix.tobytes("png")
-                pil_image = Image.open(io.BytesIO(page_img_bytes))
-                
                 prompt = f"""
 You are an expert at finding specific product images in PDF documents.
 
@@ -223,6 +285,9 @@ or
                     confidence = result.get('confidence', 'medium')
                     print(f"  🎯 Product found on page {page_num+1} (confidence: {confidence})")
                     
+                    # Only pay the PNG decode once a box is actually found —
+                    # pages with no match never need a PIL image
+                    pil_image = Image.open(io.BytesIO(page_img_bytes))
                     ymin, xmin, ymax, xmax = result['box_2d']
                     width, height = pil_image.size
                     
@@ -272,15 +337,13 @@ or
                     filename = f"visual_{safe_name}_{int(time.time())}.jpg"
                     save_path = os.path.join(upload_folder, filename)
                     crop.save(save_path, quality=95)
-                    
-                    doc.close()
+
                     return f"uploads/{filename}"
 
             except Exception as e:
                 print(f"  ⚠ Error on page {page_num}: {e}")
                 continue
-        
-        doc.close()
+
         return None
         
     except Exception as e:
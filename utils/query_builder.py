@@ -0,0 +1,41 @@
+"""
+Search-query construction for product image lookups
+Shared by the single-import and bulk-import flows
+"""
+
+import re
+
+# Real model numbers contain letters or dashes; bare integers are usually
+# invoice line numbers and only pollute the search query
+MODEL_NUMBER_RE = re.compile(r'[A-Za-z-]')
+
+
+def build_rich_query(header, fallback_name):
+    """
+    Builds a deduplicated image-search query from PIS header info.
+
+    Joins brand + product name + model number (the model number only when it
+    looks like a real model and isn't already part of the product name), then
+    drops case-insensitive duplicate words in a single O(n) seen-set pass.
+    Falls back to `fallback_name` when the header has nothing usable.
+    """
+    brand = header.get('brand', '')
+    model_number = header.get('model_number', '')
+    product_name = header.get('product_name', '')
+
+    parts = []
+    if brand: parts.append(brand)
+    if product_name: parts.append(product_name)
+    if model_number and MODEL_NUMBER_RE.search(model_number):
+        if model_number not in (product_name or ''):
+            parts.append(model_number)
+
+    seen = set()
+    unique_words = []
+    for word in " ".join(parts).split():
+        lw = word.lower()
+        if lw not in seen:
+            seen.add(lw)
+            unique_words.append(word)
+
+    return " ".join(unique_words) if unique_words else fallback_name
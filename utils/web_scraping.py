@@ -3,17 +3,62 @@ Web scraping utilities for PIS System
 Handles URL scraping and data extraction
 """
 
+import time
+import threading
+
 import requests
 from bs4 import BeautifulSoup
 
+# Shared session so single and bulk imports reuse TCP/TLS connections to the
+# same supplier host instead of handshaking per URL. Browser-like headers cut
+# down on bot-blocking 403s from supplier sites.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+})
+
+
+# ===== SCRAPE RESULT CACHE =====
+# Users often re-import from the same catalog page minutes apart (e.g. after
+# fixing invoice data), so keep recent results around instead of repeating
+# the fetch + parse. Failed scrapes are never cached.
+_SCRAPE_TTL = 300  # seconds
+_scrape_cache = {}  # {url: (fetched_at, result)}
+_scrape_lock = threading.Lock()
+
 
-def scrape_url_data(url):
+def scrape_url_data(url, nocache=False):
     """
     Scrapes a URL and returns a dictionary with 'text', 'html', and 'image_candidates'.
+    Results are cached for five minutes per URL; pass nocache=True to force a fresh fetch.
     """
+    now = time.monotonic()
+    if not nocache:
+        with _scrape_lock:
+            cached = _scrape_cache.get(url)
+            if cached:
+                if now - cached[0] < _SCRAPE_TTL:
+                    return cached[1]
+                del _scrape_cache[url]
+
+    result = _scrape_impl(url)
+    if result['text'] or result['image_candidates']:
+        with _scrape_lock:
+            # Drop anything past its TTL while we're here — page text and HTML
+            # are large, and expired entries would otherwise pile up forever
+            expired = [u for u, (ts, _) in _scrape_cache.items()
+                       if now - ts >= _SCRAPE_TTL]
+            for u in expired:
+                del _scrape_cache[u]
+            _scrape_cache[url] = (now, result)
+    return result
+
+
+def _scrape_impl(url):
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=15)
+        response = _SESSION.get(url, timeout=15)
         soup = BeautifulSoup(response.content, 'html.parser')
         
         # 1. Extract Image Candidates